@@ -0,0 +1,288 @@
+"""
+Disk-backed layered breadth-first search over n-puzzle states.
+
+Every depth layer is written as a sorted file of fixed width state
+encodings. The next layer is built by expanding the current one into
+sorted runs of at most 'chunk_size' states, then streaming a merge of the
+runs that drops duplicates and everything already in the two previous
+layers (a sliding-tile move always leads to depth d - 1 or d + 1), so
+memory use is bounded by 'chunk_size' whatever the size of the space.
+
+Layer files only appear once complete, an interrupted search resumes from
+the last finished layer when run again on the same directory.
+
+    python external_bfs.py --size 4 --pattern 1,2,3,4,5 --dir pdb_12345
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+from math import ceil
+
+from puzzle_state import PuzzleState, successor_table
+
+READ_BLOCK = 1 << 16
+
+
+class StateCodec(object):
+    """
+    Packs states into fixed width big-endian integers, so that comparing the
+    bytes compares the states
+    Attr:
+        square_size: Chessboard size
+        pattern: Tiles kept in the encoding, the others are mapped to one 'don't care' value.
+                 None keeps every tile and reserves no 'don't care' value
+        bits: Bits per cell
+        width: Bytes per encoded state
+    """
+    def __init__(self, square_size, pattern=None):
+        self.square_size = square_size
+        self.cells = square_size ** 2
+        self.pattern = None if pattern is None else frozenset(pattern)
+        # 0 is the blank, tiles keep their number, 'cells' is 'don't care' with a pattern
+        self.dont_care = None if self.pattern is None else self.cells
+        self.bits = (self.cells if self.pattern is not None else self.cells - 1).bit_length()
+        self.width = ceil(self.bits * self.cells / 8)
+        self.mask = (1 << self.bits) - 1
+        self.successors = successor_table(square_size)
+
+    def abstract(self, state):
+        """
+        Return the cell values of a puzzle state (-1 for blank) in codec terms
+        """
+        ans = []
+        for num in state:
+            if num == -1:
+                ans.append(0)
+            elif self.pattern is None or num in self.pattern:
+                ans.append(num)
+            else:
+                ans.append(self.dont_care)
+        return ans
+
+    def encode(self, cells):
+        value = 0
+        for cell in cells:
+            value = (value << self.bits) | cell
+        return value.to_bytes(self.width, "big")
+
+    def decode(self, record):
+        value = int.from_bytes(record, "big")
+        cells = [0] * self.cells
+        for idx in range(self.cells - 1, -1, -1):
+            cells[idx] = value & self.mask
+            value >>= self.bits
+        return cells
+
+    def neighbours(self, record):
+        """
+        Yield the encodings of all states one blank move away
+        """
+        cells = self.decode(record)
+        blank = cells.index(0)
+        for _, dst in self.successors[blank]:
+            cells[blank], cells[dst] = cells[dst], 0
+            yield self.encode(cells)
+            cells[blank], cells[dst] = 0, cells[blank]
+
+
+def read_records(path, width):
+    """
+    Stream the fixed width records of a file
+    """
+    block = READ_BLOCK - READ_BLOCK % width
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(block)
+            if not data:
+                return
+            for start in range(0, len(data), width):
+                yield data[start:start + width]
+
+
+def write_records(path, records):
+    """
+    Write records to 'path' atomically, return how many were written
+    """
+    tmp = path + ".tmp"
+    written = 0
+    with open(tmp, "wb") as f:
+        buffer = []
+        for record in records:
+            buffer.append(record)
+            if len(buffer) >= 4096:
+                f.write(b"".join(buffer))
+                written += len(buffer)
+                buffer = []
+        f.write(b"".join(buffer))
+        written += len(buffer)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return written
+
+
+def unique(records):
+    """
+    Drop consecutive duplicates of a sorted stream
+    """
+    last = None
+    for record in records:
+        if record != last:
+            yield record
+            last = record
+
+
+def difference(records, *excluded):
+    """
+    Yield the sorted 'records' that are in none of the sorted 'excluded' streams
+    """
+    excluded = unique(heapq.merge(*excluded))
+    current = next(excluded, None)
+    for record in records:
+        while current is not None and current < record:
+            current = next(excluded, None)
+        if record != current:
+            yield record
+
+
+class ExternalBFS(object):
+    """
+    Layered BFS from a goal state, persisted in 'directory'
+    Attr:
+        codec: StateCodec used for the layer files
+        directory: Where layers, runs and the metadata file live
+        chunk_size: Maximum number of states held in memory while expanding
+    """
+    def __init__(self, directory, goal, square_size, pattern=None, chunk_size=1 << 20):
+        self.directory = directory
+        self.codec = StateCodec(square_size, pattern)
+        self.goal = list(goal)
+        self.chunk_size = chunk_size
+        self.meta = {"square_size": square_size, "goal": self.goal,
+                     "pattern": None if pattern is None else sorted(pattern),
+                     "bits": self.codec.bits}
+
+    def layer_path(self, depth):
+        return os.path.join(self.directory, "layer_{:04d}.bin".format(depth))
+
+    def run_path(self, idx):
+        return os.path.join(self.directory, "run_{:04d}.bin".format(idx))
+
+    def layer(self, depth):
+        """
+        Stream the encodings of the states at 'depth'
+        """
+        path = self.layer_path(depth)
+        if not os.path.exists(path):
+            return iter(())
+        return read_records(path, self.codec.width)
+
+    def depths(self):
+        """
+        Return the list of finished layer depths
+        """
+        depth = 0
+        while os.path.exists(self.layer_path(depth)):
+            depth += 1
+        return list(range(depth))
+
+    def layer_sizes(self):
+        """
+        Return the number of states at each depth, without the empty layer that ends the search
+        """
+        sizes = [os.path.getsize(self.layer_path(depth)) // self.codec.width for depth in self.depths()]
+        while sizes and sizes[-1] == 0:
+            sizes.pop()
+        return sizes
+
+    def _prepare(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = os.path.join(self.directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != self.meta:
+                    raise ValueError("{} holds a search with different parameters".format(self.directory))
+        else:
+            # Written like the layers, an interrupted first run must not leave a partial file
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump(self.meta, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(meta_path + ".tmp", meta_path)
+        # Leftovers of an interrupted layer
+        for name in os.listdir(self.directory):
+            if name.startswith("run_") or name.endswith(".tmp"):
+                os.remove(os.path.join(self.directory, name))
+        if not os.path.exists(self.layer_path(0)):
+            write_records(self.layer_path(0), [self.codec.encode(self.codec.abstract(self.goal))])
+
+    def _write_runs(self, depth):
+        runs = []
+        buffer = set()
+        for record in self.layer(depth):
+            buffer.update(self.codec.neighbours(record))
+            if len(buffer) >= self.chunk_size:
+                runs.append(self.run_path(len(runs)))
+                write_records(runs[-1], sorted(buffer))
+                buffer = set()
+        if buffer:
+            runs.append(self.run_path(len(runs)))
+            write_records(runs[-1], sorted(buffer))
+        return runs
+
+    def expand(self, depth):
+        """
+        Build layer 'depth + 1' from the finished layers, return its size
+        """
+        runs = self._write_runs(depth)
+        width = self.codec.width
+        merged = unique(heapq.merge(*[read_records(run, width) for run in runs]))
+        new_layer = difference(merged, self.layer(depth), self.layer(depth - 1))
+        written = write_records(self.layer_path(depth + 1), new_layer)
+        for run in runs:
+            os.remove(run)
+        return written
+
+    def run(self, max_depth=None, verbose=False):
+        """
+        Search until the state space is exhausted (or 'max_depth' is reached),
+        resuming from the last finished layer. Return the layer sizes
+        """
+        self._prepare()
+        depth = self.depths()[-1]
+        while max_depth is None or depth < max_depth:
+            if depth > 0 and os.path.getsize(self.layer_path(depth)) == 0:
+                break
+            size = self.expand(depth)
+            depth += 1
+            if verbose:
+                print("depth {}: {} states".format(depth, size), flush=True)
+        return self.layer_sizes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Disk-backed breadth-first search over n-puzzle states.")
+    parser.add_argument("--size", type=int, default=3, help="square size")
+    parser.add_argument("--goal", help="comma separated goal state, row by row, -1 for the blank")
+    parser.add_argument("--pattern", help="comma separated tiles to keep, the others are abstracted away")
+    parser.add_argument("--dir", required=True, help="directory for the layer files")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="states held in memory per sorted run")
+    parser.add_argument("--max-depth", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    goal = PuzzleState(square_size=args.size)
+    if args.goal:
+        goal.state = [int(num) for num in args.goal.split(",")]
+    pattern = None if args.pattern is None else [int(num) for num in args.pattern.split(",")]
+
+    search = ExternalBFS(args.dir, goal.state, args.size, pattern, args.chunk_size)
+    sizes = search.run(args.max_depth, verbose=True)
+    print("{} states in {} layers".format(sum(sizes), len(sizes)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Hash-distributed A* (HDA*) for the n-puzzle.
+
+Every worker process owns the states whose hash falls in its partition and
+keeps its own open and closed lists. Generated states owned by another
+worker are batched and sent to the owner's inbox queue. The parent process
+declares the search finished once no message is in flight and no worker
+holds an open state with f below the best solution found, which proves the
+solution optimal.
+"""
+
+import heapq
+import os
+import queue
+import time
+from itertools import count
+from multiprocessing import Event, Process, Queue, RawArray, Value
+
+from puzzle_state import MOVES, SolveResult, goal_index, manhattan_distance, successor_table
+
+INF = float("inf")
+BATCH = 256            # States per message to another worker
+FLUSH_EVERY = 64       # Expansions between flushing partially filled batches
+POLL = 0.002           # Seconds a worker waits for messages when it has no work
+
+
+def _worker(idx, workers, size, goal, inboxes, results, incumbent, sent, received, min_f, expanded, stop):
+    goal_pos = goal_index(goal)
+    successors = successor_table(size)
+    inbox = inboxes[idx]
+    open_list = []
+    closed = {}
+    tie = count()
+    outboxes = [[] for _ in range(workers)]
+    pending_min = INF   # Lowest f among states waiting in the outboxes
+    since_flush = 0
+
+    def insert(batch):
+        for f, g, h, state, path in batch:
+            if g < closed.get(state, INF):
+                closed[state] = g
+                heapq.heappush(open_list, (f, h, next(tie), g, state, path))
+
+    def report():
+        top = open_list[0][0] if open_list else INF
+        min_f[idx] = min(top, pending_min)
+
+    def flush():
+        nonlocal pending_min, since_flush
+        for owner, batch in enumerate(outboxes):
+            if batch:
+                # Counted before sending, so the parent can never see it neither in flight nor received
+                sent[idx] += len(batch)
+                inboxes[owner].put(batch)
+                outboxes[owner] = []
+        pending_min = INF
+        since_flush = 0
+
+    # States left in the inboxes are not needed once the search is stopped,
+    # the results queue is drained by the parent so it must be flushed on exit
+    for inbox_q in inboxes:
+        inbox_q.cancel_join_thread()
+
+    while not stop.is_set():
+        # Receive generated states from the other workers
+        while True:
+            try:
+                batch = inbox.get(block=not open_list, timeout=POLL)
+            except queue.Empty:
+                break
+            insert(batch)
+            report()
+            received[idx] += len(batch)
+
+        bound = incumbent.value
+        if not open_list or open_list[0][0] >= bound:
+            flush()
+            report()
+            if open_list:
+                time.sleep(POLL)
+            continue
+
+        f, h, _, g, state, path = heapq.heappop(open_list)
+        if g > closed.get(state, INF):
+            report()
+            continue
+        if h == 0:
+            with incumbent.get_lock():
+                if g < incumbent.value:
+                    incumbent.value = g
+                    results.put((g, path))
+            report()
+            continue
+
+        expanded[idx] += 1
+        blank = state.index(-1)
+        for move, dst in successors[blank]:
+            num = state[dst]
+            child = list(state)
+            child[blank], child[dst] = num, -1
+            child = tuple(child)
+            # Only the moved tile changes its distance to the goal
+            gp = goal_pos[num]
+            child_h = h - abs(dst // size - gp // size) - abs(dst % size - gp % size) \
+                + abs(blank // size - gp // size) + abs(blank % size - gp % size)
+            child_f = g + 1 + child_h
+            if child_f >= bound:
+                continue
+            item = (child_f, g + 1, child_h, child, path + bytes((move,)))
+            owner = hash(child) % workers
+            if owner == idx:
+                insert((item,))
+            else:
+                outboxes[owner].append(item)
+                pending_min = min(pending_min, child_f)
+                if len(outboxes[owner]) >= BATCH:
+                    flush()
+        since_flush += 1
+        if since_flush >= FLUSH_EVERY:
+            flush()
+        report()
+
+
+def _finished(incumbent, sent, received, min_f):
+    before = (sum(sent), sum(received))
+    if before[0] != before[1]:
+        return False
+    bound = incumbent.value
+    if any(value < bound for value in min_f):
+        return False
+    return (sum(sent), sum(received)) == before
+
+
+def _check_workers(processes):
+    """
+    Raise if a worker died, its partition could never be finished
+    """
+    for process in processes:
+        if process.exitcode is not None:
+            raise RuntimeError("HDA* worker {} exited with code {}".format(process.name, process.exitcode))
+
+
+def hda_star_search(init_state, dst_state, workers=None):
+    """
+    Search a shortest path from 'init_state' to 'dst_state' with 'workers' processes
+    :return:
+        path: List of Move, empty if there is no solution
+        expansions: Number of expanded states summed over the workers
+    """
+    workers = workers or os.cpu_count() or 1
+    size = init_state.square_size
+    start, goal = init_state.state, dst_state.state
+
+    inboxes = [Queue() for _ in range(workers)]
+    results = Queue()
+    incumbent = Value("d", INF)
+    sent = RawArray("q", workers)
+    received = RawArray("q", workers)
+    min_f = RawArray("d", [INF] * workers)
+    expanded = RawArray("q", workers)
+    stop = Event()
+
+    h = manhattan_distance(start, goal, size)
+    owner = hash(start) % workers
+    min_f[owner] = h
+    sent[owner] += 1
+    inboxes[owner].put([(h, 0, h, start, b"")])
+
+    processes = [Process(target=_worker, daemon=True,
+                         args=(idx, workers, size, goal, inboxes, results, incumbent,
+                               sent, received, min_f, expanded, stop))
+                 for idx in range(workers)]
+    for process in processes:
+        process.start()
+
+    best = (INF, b"")
+    try:
+        while not _finished(incumbent, sent, received, min_f):
+            _check_workers(processes)
+            try:
+                best = min(best, results.get(timeout=POLL))
+            except queue.Empty:
+                pass
+        stop.set()
+        # The incumbent is raised before its path is queued, wait for that path.
+        # Workers flush the results queue before exiting, so once they are all
+        # gone and the queue is empty the path was lost
+        while best[0] > incumbent.value:
+            alive = any(process.is_alive() for process in processes)
+            try:
+                best = min(best, results.get(timeout=POLL))
+            except queue.Empty:
+                if not alive:
+                    raise RuntimeError("HDA* lost the path of the best solution")
+    finally:
+        stop.set()
+        for process in processes:
+            while process.is_alive():
+                try:
+                    best = min(best, results.get(timeout=POLL))
+                except queue.Empty:
+                    process.join(timeout=POLL)
+
+    return [MOVES[move] for move in best[1]], sum(expanded)
+
+
+def hda_star_solve(init_state, dst_state, workers=None):
+    """
+    HDA* search with the manhattan distance heuristic
+    :return:
+        SolveResult
+    """
+    start = time.perf_counter()
+    path, expansions = hda_star_search(init_state, dst_state, workers)
+    solved = bool(path) or init_state.state == dst_state.state
+    return SolveResult(path, solved, expansions, time.perf_counter() - start, "hda", "manhattan", True)
+
+
+def hda_star_search_for_puzzle_problem(init_state, dst_state, workers=None):
+    path, _ = hda_star_search(init_state, dst_state, workers)
+    return path
@@ -1,43 +1,98 @@
-from puzzle_state import PuzzleState, astar_search_for_puzzle_problem, run_moves, generate_moves, print_moves, convert_moves, runs
-import numpy as np
+"""
+Scramble an n-puzzle goal state and solve it back.
 
-def main():
+    python n_puzzle_state_main.py --size 3 --scramble 40 --seed 7
+    python n_puzzle_state_main.py --format json > result.json
 
-    # Create a initial state randomly
-    square_size = 4
+Cold start budget: importing this module must not pull in NumPy or
+multiprocessing and must stay under IMPORT_BUDGET_MS, test_puzzle_state.py
+measures it with `python -X importtime`.
+"""
 
-    init_state = PuzzleState(square_size=square_size)
-    # dst = [1, 2, 3,
-    #        8,-1, 6,
-    #        7, 4, 5]
-    dst = [1,  4, 5,  14,
-           2,  6, 13, 15,
-           11, 7, -1, 10,
-           8,  9, 12, 3  ]
-    init_state.state = np.asarray(dst).reshape(square_size, square_size)
+import sys
+from functools import partial
 
-    move_list = generate_moves(100)
-    init_state.state = runs(init_state, move_list).state
+from puzzle_state import PuzzleState, astar_solve, run_moves, print_moves, scramble
+
+IMPORT_BUDGET_MS = 50
+
+# dst = [1, 2, 3,
+#        8,-1, 6,
+#        7, 4, 5]
+DEFAULT_GOALS = {
+    4: [1,  4, 5,  14,
+        2,  6, 13, 15,
+        11, 7, -1, 10,
+        8,  9, 12, 3  ],
+}
+
+def hda_star_solve(init_state, dst_state, workers=None):
+    # Imported on use, it pulls in multiprocessing
+    from hda_star import hda_star_solve
+    return hda_star_solve(init_state, dst_state, workers)
+
+
+SOLVERS = {
+    "astar": astar_solve,
+    "hda": hda_star_solve,
+}
+
+
+def parse_args(argv=None):
+    # Imported here, argparse (and re with it) is a large part of the cold start
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scramble an n-puzzle and solve it.")
+    parser.add_argument("--size", type=int, default=4, help="square size, 3 for the 8-puzzle")
+    parser.add_argument("--goal", help="comma separated goal state, row by row, -1 for the blank")
+    parser.add_argument("--scramble", type=int, default=100, help="number of random moves applied to the goal")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the scramble")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="astar")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes of the hda solver (default: all cores)")
+    parser.add_argument("--format", choices=["text", "json", "binary"], default="text", help="output format of the result")
+    parser.add_argument("--boards", action="store_true", help="with text output, print the board after every move")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    square_size = args.size
 
     # Set a determined destination state
     dst_state = PuzzleState(square_size=square_size)
-    dst_state.state = np.asarray(dst).reshape(square_size, square_size)
+    if args.goal:
+        dst_state.state = [int(num) for num in args.goal.split(",")]
+    elif square_size in DEFAULT_GOALS:
+        dst_state.state = DEFAULT_GOALS[square_size]
+
+    # Create a initial state by scrambling the destination
+    init_state = scramble(dst_state, args.scramble, args.seed)
 
     # Find the path from 'init_state' to 'dst_state'
-    move_list = astar_search_for_puzzle_problem(init_state, dst_state)
+    solver = SOLVERS[args.solver]
+    if args.solver == "hda":
+        solver = partial(solver, workers=args.workers)
+    result = solver(init_state, dst_state)
 
-    move_list = convert_moves(move_list)
+    if args.format == "json":
+        sys.stdout.write(result.to_json() + "\n")
+        return 0 if result.solved else 1
+    if args.format == "binary":
+        sys.stdout.buffer.write(result.to_bytes())
+        return 0 if result.solved else 1
 
     # Perform your path
-    if run_moves(init_state, dst_state, move_list):
-        print_moves(init_state, move_list)
-        print("Our dst state: ")
-        dst_state.display()
+    success = run_moves(init_state, dst_state, result.moves)
+    print_moves(init_state, result.moves, boards=args.boards)
+    print("Our dst state: ")
+    dst_state.display()
+    print(result)
+    if success:
         print("Get to dst state. Success !!!")
     else:
-        print_moves(init_state, move_list)
-        print("Our dst state: ")
-        dst_state.display()
         print("Can not get to dst state. Failed !!!")
+    return 0 if success else 1
+
 
-main()
+if __name__ == "__main__":
+    sys.exit(main())
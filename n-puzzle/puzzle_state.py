@@ -1,7 +1,14 @@
-from queue import PriorityQueue
-import numpy as np
+import heapq
+import struct
+import sys
+import time
 from enum import Enum
-import copy
+from functools import lru_cache
+from itertools import count
+from random import Random
+
+# NumPy is only needed by PuzzleState.as_array(), it is imported lazily there
+# so that solving does not pay its import cost
 
 
 # Enum of operation in EightPuzzle problem
@@ -16,13 +23,58 @@ class Move(Enum):
     Right = 3
 
 
+# Move by value, avoids the Enum lookup in the hot path
+MOVES = tuple(Move)
+# (row, col) offset of the blank for each move value
+MOVE_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+@lru_cache(maxsize=None)
+def successor_table(square_size):
+    """
+    Precompute the blank moves of a board size
+    :param square_size: Chessboard size
+    :return:
+        table: tuple indexed by blank position, each entry is a tuple of (move value, swapped index)
+               for the valid moves, in Move order
+    """
+    table = []
+    for blank in range(square_size ** 2):
+        row, col = divmod(blank, square_size)
+        successors = []
+        for value, (d_row, d_col) in enumerate(MOVE_DELTAS):
+            dst_row, dst_col = row + d_row, col + d_col
+            if 0 <= dst_row < square_size and 0 <= dst_col < square_size:
+                successors.append((value, dst_row * square_size + dst_col))
+        table.append(tuple(successors))
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def move_table(square_size):
+    """
+    Precompute the swapped index of every move of a board size
+    :param square_size: Chessboard size
+    :return:
+        table: tuple indexed by blank position, each entry maps move value -> swapped index, -1 if invalid
+    """
+    table = []
+    for successors in successor_table(square_size):
+        dst = [-1] * len(MOVES)
+        for value, idx in successors:
+            dst[value] = idx
+        table.append(tuple(dst))
+    return tuple(table)
+
+
 # EightPuzzle state
 class PuzzleState(object):
     """
     Class for state in EightPuzzle-Problem
     Attr:
         square_size: Chessboard size, e.g: In 8-puzzle problem, square_size = 3
-        state: 'square_size' x 'square_size square', '-1' indicates the 'blank' block  (For 8-puzzle, state is a 3 x 3 array)
+        state: Flat row-major tuple of the 'square_size' x 'square_size' square, '-1' indicates the 'blank' block
+               (For 8-puzzle, state is a tuple of 9 numbers). Nested lists or NumPy arrays can be assigned to it
         g: The cost from initial state to current state
         h: The value of heuristic function
         pre_move:  The previous operation to get to current state
@@ -30,7 +82,7 @@ class PuzzleState(object):
     """
     def __init__(self, square_size = 3):
         self.square_size = square_size
-        self.state = None
+        self._state = None
         self.g = 0
         self.h = 0
         self.pre_move = None
@@ -38,11 +90,29 @@ class PuzzleState(object):
 
         self.generate_state()
 
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        if hasattr(value, "tolist"):  # NumPy array
+            value = value.tolist()
+        flat = []
+        for item in value:
+            if isinstance(item, (list, tuple)):
+                flat.extend(item)
+            else:
+                flat.append(item)
+        if len(flat) != self.square_size ** 2:
+            raise ValueError("state should have {} numbers, got {}".format(self.square_size ** 2, len(flat)))
+        self._state = tuple(int(num) for num in flat)
+
     def __eq__(self, other):
-        return (self.state == other.state).all()
+        return self.state == other.state
 
     def __str__(self):
-        return np.array_str(self.state)
+        return "\n".join(" ".join("{:>3}".format(num) for num in row) for row in self.rows())
     
     def __lt__(self, other):
         # Compare PuzzleState objects based on their f value (g + h)
@@ -55,13 +125,7 @@ class PuzzleState(object):
             row: 'blank' row index, '-1' indicates the current state may be invalid
             col: 'blank' col index, '-1' indicates the current state may be invalid
         """
-        index = np.argwhere(self.state == -1)
-        row = -1
-        col = -1
-        if index.shape[0] == 1:  # find blank
-            row = index[0][0]
-            col = index[0][1]
-        return row, col
+        return self.num_pos(-1)
 
     def num_pos(self, num):
         """
@@ -70,13 +134,25 @@ class PuzzleState(object):
             row: 'num' row index, '-1' indicates the current state may be invalid
             col: 'num' col index, '-1' indicates the current state may be invalid
         """
-        index = np.argwhere(self.state == num)
-        row = -1
-        col = -1
-        if index.shape[0] == 1:  # find number
-            row = index[0][0]
-            col = index[0][1]
-        return row, col
+        if self.state.count(num) != 1:
+            return -1, -1
+        return divmod(self.state.index(num), self.square_size)
+
+    def rows(self):
+        """
+        Return the state as a list of row tuples
+        :return:
+        """
+        size = self.square_size
+        return [self.state[i:i + size] for i in range(0, size * size, size)]
+
+    def as_array(self):
+        """
+        Return the state as a 'square_size' x 'square_size' NumPy array
+        :return:
+        """
+        import numpy as np
+        return np.asarray(self.state).reshape(self.square_size, self.square_size)
 
     def is_valid(self):
         """
@@ -92,10 +168,17 @@ class PuzzleState(object):
 
     def clone(self):
         """
-        Return the state's deepcopy
+        Return a copy of the state, the (immutable) parent chain is shared
         :return:
         """
-        return copy.deepcopy(self)
+        other = PuzzleState.__new__(PuzzleState)
+        other.square_size = self.square_size
+        other._state = self._state
+        other.g = self.g
+        other.h = self.h
+        other.pre_move = self.pre_move
+        other.pre_state = self.pre_state
+        return other
 
     def generate_state(self, random=False, seed=None):
         """
@@ -104,35 +187,41 @@ class PuzzleState(object):
         :param seed: Choose the seed of random, only used when random = True
         :return:
         """
-        self.state = np.arange(0, self.square_size ** 2).reshape(self.square_size, -1)
-        self.state[self.state == 0] = -1  # Set blank
+        size = self.square_size
+        state = [num if num else -1 for num in range(size ** 2)]  # Set blank
 
         if random:
-            np.random.seed(seed)
-            np.random.shuffle(self.state)
+            # Shuffle the rows, as the original NumPy implementation did
+            rows = [state[i:i + size] for i in range(0, size ** 2, size)]
+            Random(seed).shuffle(rows)
+            state = [num for row in rows for num in row]
+
+        self._state = tuple(state)
+
+    def render(self):
+        """
+        Return the text printed by display()
+        :return:
+        """
+        lines = ["----------------------"]
+        for row in self.rows():
+            lines.append("".join("{}\t".format(num) for num in row))
+        lines.append("----------------------\n\n")
+        return "\n".join(lines)
 
     def display(self):
         """
         Print state
         :return:
         """
-        print("----------------------")
-        for i in range(self.state.shape[0]):
-            # print("{}\t{}\t{}\t".format(self.state[i][0], self.state[i][1], self.state[i][2]))
-            # print(self.state[i, :])
-            for j in range(self.state.shape[1]):
-                if j == self.state.shape[1] - 1:
-                    print("{}\t".format(self.state[i][j]))
-                else:
-                    print("{}\t".format(self.state[i][j]), end='')
-        print("----------------------\n")
+        sys.stdout.write(self.render())
 
 
 def check_move(curr_state, move):
     """
     Check the operation 'move' can be performed on current state 'curr_state'
     :param curr_state: Current puzzle state
-    :param move: Operation to be performed
+    :param move: Operation to be performed, a Move or its int value
     :return:
         valid_op: boolean, True - move is valid; False - move is invalid
         src_row: int, current blank row index
@@ -140,34 +229,33 @@ def check_move(curr_state, move):
         dst_row: int, future blank row index after move
         dst_col: int, future blank col index after move
     """
-    # assert isinstance(move, Move)  # Check operation type
-    assert curr_state.is_valid()
-
-    if not isinstance(move, Move):
-        move = Move(move)
-
-    src_row, src_col = curr_state.blank_pos()
-    dst_row, dst_col = src_row, src_col
-    valid_op = False
-
-    if move == Move.Up:  # Number moves up, blank moves down
-        dst_row -= 1
-    elif move == Move.Down:
-        dst_row += 1
-    elif move == Move.Left:
-        dst_col -= 1
-    elif move == Move.Right:
-        dst_col += 1
-    else:  # Invalid operation
-        dst_row = -1
-        dst_col = -1
-
-    if dst_row < 0 or dst_row > curr_state.state.shape[0] - 1 or dst_col < 0 or dst_col > curr_state.state.shape[1] - 1:
-        valid_op = False
-    else:
-        valid_op = True
+    size = curr_state.square_size
+    blank = curr_state.state.index(-1)
+    src_row, src_col = divmod(blank, size)
+    value = move.value if isinstance(move, Move) else move
+
+    if not 0 <= value < len(MOVES):  # Invalid operation
+        return False, src_row, src_col, -1, -1
 
-    return valid_op, src_row, src_col, dst_row, dst_col
+    dst = move_table(size)[blank][value]
+    if dst == -1:
+        d_row, d_col = MOVE_DELTAS[value]
+        return False, src_row, src_col, src_row + d_row, src_col + d_col
+    dst_row, dst_col = divmod(dst, size)
+    return True, src_row, src_col, dst_row, dst_col
+
+
+def _swap(curr_state, blank, dst, move):
+    """
+    Return the child of 'curr_state' where the blank at 'blank' is swapped with index 'dst'
+    """
+    state = list(curr_state.state)
+    state[blank], state[dst] = state[dst], -1
+    next_state = curr_state.clone()
+    next_state._state = tuple(state)
+    next_state.pre_state = curr_state
+    next_state.pre_move = move
+    return next_state
 
 
 def once_move(curr_state, move):
@@ -179,19 +267,14 @@ def once_move(curr_state, move):
         valid_op: boolean, flag of this move is valid or not. True - valid move, False - invalid move
         next_state: EightPuzzleState, state after this move
     """
-    valid_op, src_row, src_col, dst_row, dst_col = check_move(curr_state, move)
-
-    next_state = curr_state.clone()
+    value = move.value if isinstance(move, Move) else move
+    blank = curr_state.state.index(-1)
+    dst = move_table(curr_state.square_size)[blank][value] if 0 <= value < len(MOVES) else -1
 
-    if valid_op:
-        it = next_state.state[dst_row][dst_col]
-        next_state.state[dst_row][dst_col] = -1
-        next_state.state[src_row][src_col] = it
-        next_state.pre_state = curr_state
-        next_state.pre_move = move
-        return True, next_state
+    if dst != -1:
+        return True, _swap(curr_state, blank, dst, move)
     else:
-        return False, next_state
+        return False, curr_state.clone()
 
 
 def check_state(src_state, dst_state):
@@ -201,7 +284,7 @@ def check_state(src_state, dst_state):
     :param dst_state:
     :return:
     """
-    return (src_state.state == dst_state.state).all()
+    return src_state.state == dst_state.state
 
 
 def run_moves(curr_state, dst_state, moves):
@@ -215,7 +298,7 @@ def run_moves(curr_state, dst_state, moves):
         flag of moves: True - We can get 'dst_state' from 'curr_state' by 'moves'
     """
     pre_state = curr_state.clone()
-    next_state = None
+    next_state = pre_state
 
     for move in moves:
         valid_move, next_state = once_move(pre_state, move)
@@ -240,7 +323,7 @@ def runs(curr_state, moves):
     :return:
     """
     pre_state = curr_state.clone()
-    next_state = None
+    next_state = pre_state
 
     for move in moves:
         valid_move, next_state = once_move(pre_state, move)
@@ -248,48 +331,63 @@ def runs(curr_state, moves):
     return next_state
 
 
-def print_moves(init_state, moves):
+def render_moves(init_state, moves, boards=True):
     """
-    While performing the list of move to current state, this function will also print how each move is performed
+    Return the text describing how each move of the list is performed
     :param init_state: The initial state
     :param moves: List of move
+    :param boards: Also render the board after every move, False only renders the initial and final states
     :return:
     """
-    print("Initial state")
-    init_state.display()
+    out = ["Initial state\n", init_state.render()]
 
     pre_state = init_state.clone()
-    next_state = None
+    next_state = pre_state
 
     for idx, move in enumerate(moves):
         if move == Move.Up:  # Number moves up, blank moves down
-            print("{} th move. Goes up.".format(idx))
+            out.append("{} th move. Goes up.\n".format(idx))
         elif move == Move.Down:
-            print("{} th move. Goes down.".format(idx))
+            out.append("{} th move. Goes down.\n".format(idx))
         elif move == Move.Left:
-            print("{} th move. Goes left.".format(idx))
+            out.append("{} th move. Goes left.\n".format(idx))
         elif move == Move.Right:
-            print("{} th move. Goes right.".format(idx))
+            out.append("{} th move. Goes right.\n".format(idx))
         else:  # Invalid operation
-            print("{} th move. Invalid move: {}".format(idx, move))
+            out.append("{} th move. Invalid move: {}\n".format(idx, move))
 
         valid_move, next_state = once_move(pre_state, move)
 
         if not valid_move:
-            print("Invalid move: {}, ignore".format(move))
+            out.append("Invalid move: {}, ignore\n".format(move))
 
-        next_state.display()
+        if boards:
+            out.append(next_state.render())
 
         pre_state = next_state.clone()
 
-    print("We get final state: ")
-    next_state.display()
+    out.append("We get final state: \n")
+    out.append(next_state.render())
+    return "".join(out)
 
 
-def generate_moves(move_num = 30):
+def print_moves(init_state, moves, boards=True):
+    """
+    While performing the list of move to current state, this function will also print how each move is performed
+    The whole report is rendered first and written at once
+    :param init_state: The initial state
+    :param moves: List of move
+    :param boards: Also print the board after every move
+    :return:
+    """
+    sys.stdout.write(render_moves(init_state, moves, boards))
+
+
+def generate_moves(move_num = 30, seed=None):
     """
     Generate a list of move in a determined length randomly
     :param move_num:
+    :param seed: Seed of the random generator, None for a random seed
     :return:
         move_list: list of move
     """
@@ -299,14 +397,26 @@ def generate_moves(move_num = 30):
     move_dict[2] = Move.Left
     move_dict[3] = Move.Right
 
-    index_arr = np.random.randint(0, 4, move_num)
-    index_list = list(index_arr)
-
-    move_list = [move_dict[idx] for idx in index_list]
+    rng = Random(seed)
+    move_list = [move_dict[rng.randrange(4)] for _ in range(move_num)]
 
     return move_list
 
 
+def scramble(dst_state, move_num=30, seed=None):
+    """
+    Scramble 'dst_state' with a list of random moves
+    :param dst_state:
+    :param move_num:
+    :param seed: Seed of the random generator, None for a random seed
+    :return:
+        init_state: New state, 'dst_state' is left unchanged
+    """
+    init_state = dst_state.clone()
+    init_state.state = runs(init_state, generate_moves(move_num, seed)).state
+    return init_state
+
+
 def convert_moves(moves):
     """
     Convert moves from int into Move type
@@ -322,32 +432,156 @@ def convert_moves(moves):
         return moves
 
 
+@lru_cache(maxsize=16)
+def goal_index(goal):
+    """
+    Map every number of the flat 'goal' state to its flat index, computed once per goal
+    """
+    return {num: idx for idx, num in enumerate(goal)}
+
+
+def manhattan_distance(state, goal, square_size):
+    """
+    Sum of the manhattan distances of every tile of 'state' to its place in 'goal' (both flat tuples)
+    """
+    goal_pos = goal_index(goal)
+    total_dist = 0
+    for idx, num in enumerate(state):
+        if num != -1:
+            pos = goal_pos[num]
+            total_dist += abs(idx // square_size - pos // square_size) + abs(idx % square_size - pos % square_size)
+    return total_dist
+
+
 def update_cost(curr_state, dst_state):
     """
     Update the cost of the current state (g and h values).
     """
-    def manhattan_distance(state1, state2):
-        total_dist = 0
-        for i in range(1, state1.square_size ** 2):
-            x1, y1 = state1.num_pos(i)
-            x2, y2 = state2.num_pos(i)
-            total_dist += abs(x1 - x2) + abs(y1 - y2)
-        return total_dist
-
     curr_state.g = curr_state.g if curr_state.pre_state is None else curr_state.pre_state.g + 1
-    curr_state.h = manhattan_distance(curr_state, dst_state)
+    curr_state.h = manhattan_distance(curr_state.state, dst_state.state, curr_state.square_size)
 
-def astar_search_for_puzzle_problem(init_state, dst_state):
-    # Initialize the open list with the initial state
-    open_list = PriorityQueue()
-    open_list.put((0, init_state))
 
-    # Dictionary to store the best g values for visited states
-    visited = {str(init_state): init_state.g}
+class SolveResult(object):
+    """
+    Result of a solver run
+    Attr:
+        moves: List of Move from the initial state to the destination, empty if not solved
+        solved: Whether a path was found
+        cost: Number of moves, None if not solved
+        expansions: Number of expanded states
+        time: Wall clock seconds spent searching
+        solver: Name of the solver
+        heuristic: Name of the heuristic function
+        optimal: Whether the solver guarantees 'moves' is a shortest path
+    """
+    MAGIC = b"NPSR"
+    HEADER = struct.Struct("<4sBBQdI")  # magic, version, flags, expansions, time, number of moves
+    NAME_LENGTH = struct.Struct("<H")
+
+    def __init__(self, moves, solved, expansions, time, solver, heuristic, optimal):
+        self.moves = convert_moves(list(moves))
+        self.solved = solved
+        self.expansions = expansions
+        self.time = time
+        self.solver = solver
+        self.heuristic = heuristic
+        self.optimal = optimal
+
+    @property
+    def cost(self):
+        return len(self.moves) if self.solved else None
+
+    def __eq__(self, other):
+        if not isinstance(other, SolveResult):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return "SolveResult(solver={}, cost={}, expansions={}, time={:.3f}s)".format(
+            self.solver, self.cost, self.expansions, self.time)
+
+    def to_dict(self):
+        return {
+            "solver": self.solver,
+            "heuristic": self.heuristic,
+            "solved": self.solved,
+            "optimal": self.optimal,
+            "cost": self.cost,
+            "expansions": self.expansions,
+            "time": self.time,
+            "moves": [move.value for move in self.moves],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["moves"], data["solved"], data["expansions"], data["time"],
+                   data["solver"], data["heuristic"], data["optimal"])
+
+    def to_json(self):
+        import json
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        import json
+        return cls.from_dict(json.loads(text))
+
+    def to_bytes(self):
+        """
+        Compact binary form: fixed header, length prefixed solver and heuristic names,
+        then moves packed 4 per byte
+        :return:
+        """
+        flags = int(self.solved) | int(self.optimal) << 1
+        out = [self.HEADER.pack(self.MAGIC, 1, flags, self.expansions, self.time, len(self.moves))]
+        for name in (self.solver, self.heuristic):
+            name = name.encode()
+            if len(name) > 0xFFFF:
+                raise ValueError("name too long for the binary format: {} bytes".format(len(name)))
+            out.append(self.NAME_LENGTH.pack(len(name)) + name)
+        packed = bytearray((len(self.moves) + 3) // 4)
+        for idx, move in enumerate(self.moves):
+            packed[idx // 4] |= move.value << (idx % 4 * 2)
+        out.append(bytes(packed))
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, flags, expansions, elapsed, move_num = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != 1:
+            raise ValueError("not a SolveResult")
+        offset = cls.HEADER.size
+        names = []
+        for _ in range(2):
+            length, = cls.NAME_LENGTH.unpack_from(data, offset)
+            offset += cls.NAME_LENGTH.size
+            names.append(data[offset:offset + length].decode())
+            offset += length
+        moves = [data[offset + idx // 4] >> (idx % 4 * 2) & 3 for idx in range(move_num)]
+        return cls(moves, bool(flags & 1), expansions, elapsed, names[0], names[1], bool(flags & 2))
+
+
+def astar_solve(init_state, dst_state):
+    """
+    A* search with the manhattan distance heuristic
+    :return:
+        SolveResult
+    """
+    start = time.perf_counter()
+    expansions = 0
+    successors = successor_table(init_state.square_size)
 
-    while not open_list.empty():
+    # Initialize the open list with the initial state, ties on f are broken by insertion order
+    tie = count()
+    open_list = [(0, next(tie), init_state)]
+
+    # Dictionary to store the best f values for visited states
+    visited = {init_state.state: init_state.g}
+
+    path = None
+    while open_list:
         # Get the state with the lowest f value
-        _, curr_state = open_list.get()
+        _, _, curr_state = heapq.heappop(open_list)
 
         # Check if we reached the destination state
         if check_state(curr_state, dst_state):
@@ -356,19 +590,29 @@ def astar_search_for_puzzle_problem(init_state, dst_state):
             while curr_state.pre_move is not None:
                 path.append(curr_state.pre_move)
                 curr_state = curr_state.pre_state
-            return path[::-1]  # Return reversed path
-
-        # Iterate over possible moves
-        for move in Move:
-            valid_move, next_state = once_move(curr_state, move)
-            if valid_move:
-                update_cost(next_state, dst_state)
-                f_value = next_state.g + next_state.h
-                next_state_str = str(next_state)
-
-                # Check if this path is better than any previously found path
-                if next_state_str not in visited or f_value < visited[next_state_str]:
-                    visited[next_state_str] = f_value
-                    open_list.put((f_value, next_state))
-
-    return []  # Return empty list if no path is found
+            path.reverse()
+            break
+
+        # Iterate over the valid moves of the blank
+        expansions += 1
+        blank = curr_state.state.index(-1)
+        for value, dst in successors[blank]:
+            next_state = _swap(curr_state, blank, dst, MOVES[value])
+            update_cost(next_state, dst_state)
+            f_value = next_state.g + next_state.h
+            next_key = next_state.state
+
+            # Check if this path is better than any previously found path
+            if next_key not in visited or f_value < visited[next_key]:
+                visited[next_key] = f_value
+                heapq.heappush(open_list, (f_value, next(tie), next_state))
+
+    return SolveResult(path or [], path is not None, expansions, time.perf_counter() - start,
+                       "astar", "manhattan", True)
+
+
+def astar_search_for_puzzle_problem(init_state, dst_state):
+    """
+    Return the list of Move found by astar_solve(), empty if no path is found
+    """
+    return astar_solve(init_state, dst_state).moves
@@ -0,0 +1,41 @@
+"""
+Regression checks for the HDA* solver against single-threaded A*.
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+import hda_star
+from puzzle_state import PuzzleState, astar_solve, run_moves, scramble
+
+
+@pytest.mark.parametrize("square_size, move_num, seed", [(3, 60, 1), (3, 80, 2), (4, 60, 3), (4, 100, 5)])
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_matches_astar(square_size, move_num, seed, workers):
+    dst_state = PuzzleState(square_size=square_size)
+    init_state = scramble(dst_state, move_num, seed)
+    expected = astar_solve(init_state, dst_state)
+    result = hda_star.hda_star_solve(init_state, dst_state, workers)
+    assert result.solved and result.optimal
+    assert result.cost == expected.cost
+    assert run_moves(init_state, dst_state, result.moves)
+
+
+def _dying_worker(idx, *args):
+    if idx == 0:
+        os._exit(3)
+    _live_worker(idx, *args)
+
+
+_live_worker = hda_star._worker
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="patching the worker needs fork")
+def test_dead_worker_raises(monkeypatch):
+    monkeypatch.setattr(hda_star, "_worker", _dying_worker)
+    dst_state = PuzzleState(square_size=3)
+    init_state = scramble(dst_state, 60, 1)
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        hda_star.hda_star_search(init_state, dst_state, workers=2)
@@ -0,0 +1,58 @@
+"""
+Checks for puzzle_state and the n_puzzle_state_main entry point.
+"""
+
+import os
+import subprocess
+import sys
+
+from n_puzzle_state_main import IMPORT_BUDGET_MS
+from puzzle_state import Move, PuzzleState, SolveResult, astar_solve, scramble
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def cold_import(module):
+    """
+    Imports 'module' in a fresh interpreter, returns (cumulative import time in ms, loaded module names)
+    """
+    code = "import sys, {}; print(' '.join(sys.modules))".format(module)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    for line in proc.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000, set(proc.stdout.split())
+    raise AssertionError("no import time reported for " + module)
+
+
+def test_cold_start_budget():
+    for module in ("puzzle_state", "n_puzzle_state_main"):
+        # Best of a few runs, the first one may pay for a cold disk cache
+        elapsed, modules = min(cold_import(module) for _ in range(3))
+        assert "numpy" not in modules
+        assert "multiprocessing" not in modules
+        assert elapsed < IMPORT_BUDGET_MS, "{} took {:.1f} ms".format(module, elapsed)
+
+
+def solved_result():
+    dst_state = PuzzleState(square_size=3)
+    return astar_solve(scramble(dst_state, 40, 7), dst_state)
+
+
+def test_solve_result_round_trip():
+    results = [
+        solved_result(),
+        SolveResult([], False, 12, 0.5, "hda", "manhattan", True),
+        # Move counts that do not fill the last packed byte, and a name longer than 255 bytes
+        SolveResult([Move.Right] * 5, True, 0, 0.0, "s" * 300, "h", False),
+    ]
+    for result in results:
+        assert SolveResult.from_json(result.to_json()) == result
+        assert SolveResult.from_bytes(result.to_bytes()) == result
+
+
+def test_solve_result_compares_with_other_types():
+    result = solved_result()
+    assert result != "not a result"
+    assert result.__eq__(None) is NotImplemented
@@ -0,0 +1,132 @@
+"""
+Batch evaluation of Tic Tac Toe positions with NumPy.
+
+Boards are encoded as an (N, 9) integer array, row by row, with
+0 for EMPTY, 1 for X and 2 for O. Every cell array is also a base 3
+number, which indexes the solved-position table used for minimax values.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+import tictactoe as ttt
+
+CELL = {ttt.EMPTY: 0, ttt.X: 1, ttt.O: 2}
+SYMBOL = {0: ttt.EMPTY, 1: ttt.X, 2: ttt.O}
+
+# The 8 winning lines as flat cell indexes
+LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6],
+])
+POWERS = 3 ** np.arange(8, -1, -1)
+
+
+def encode(boards):
+    """
+    Returns the (N, 9) int8 array for a list of nested list boards.
+    """
+    return np.array([[CELL[cell] for row in board for cell in row] for board in boards],
+                    dtype=np.int8).reshape(-1, 9)
+
+
+def decode(cells):
+    """
+    Returns the nested list boards for an (N, 9) array.
+    """
+    return [[[SYMBOL[int(c)] for c in row[i:i + 3]] for i in range(0, 9, 3)] for row in cells]
+
+
+def keys(cells):
+    """
+    Returns the base 3 index of every board.
+    """
+    return np.asarray(cells, dtype=np.int64) @ POWERS
+
+
+def winners(cells):
+    """
+    Returns 1 where X has won, 2 where O has won, 0 otherwise.
+    Like winner(), the first complete line in LINES order decides.
+    """
+    lines = np.asarray(cells)[:, LINES]
+    won = (lines[:, :, 0] != 0) & (lines[:, :, 0] == lines[:, :, 1]) & (lines[:, :, 1] == lines[:, :, 2])
+    first = won.argmax(axis=1)
+    rows = np.arange(len(lines))
+    return np.where(won[rows, first], lines[rows, first, 0], 0).astype(np.int8)
+
+
+def terminals(cells):
+    """
+    Returns True where the game is over.
+    """
+    cells = np.asarray(cells)
+    return (winners(cells) != 0) | (cells != 0).all(axis=1)
+
+
+def players(cells):
+    """
+    Returns the side to move, 1 for X and 2 for O, 0 once the board is full.
+    Like player(), won boards with empty cells still report a side.
+    """
+    cells = np.asarray(cells)
+    count_x = (cells == 1).sum(axis=1)
+    count_o = (cells == 2).sum(axis=1)
+    side = np.where(count_o >= count_x, 1, 2).astype(np.int8)
+    side[count_x + count_o == 9] = 0
+    return side
+
+
+@lru_cache(maxsize=None)
+def solved_table():
+    """
+    Returns the minimax value (1 X wins, -1 O wins, 0 tie) of all 3 ** 9
+    cell combinations indexed by key, computed once per process.
+    """
+    all_cells = (np.arange(3 ** 9)[:, None] // POWERS) % 3
+    done = terminals(all_cells)
+    static = winners(all_cells)
+    side = players(all_cells)
+    value = np.zeros(3 ** 9, dtype=np.int8)
+    value[static == 1] = 1
+    value[static == 2] = -1
+
+    # Fill in positions from the fullest boards backwards, each one only
+    # depends on positions with one more stone which are already solved
+    filled = (all_cells != 0).sum(axis=1)
+    for stones in range(8, -1, -1):
+        todo = np.flatnonzero((filled == stones) & ~done)
+        if todo.size == 0:
+            continue
+        best = np.where(side[todo] == 1, -2, 2)
+        for cell in range(9):
+            free = all_cells[todo, cell] == 0
+            child = value[np.where(free, todo + side[todo] * POWERS[cell], todo)]
+            best = np.where(free & (side[todo] == 1), np.maximum(best, child), best)
+            best = np.where(free & (side[todo] == 2), np.minimum(best, child), best)
+        value[todo] = best
+    value.flags.writeable = False
+    return value
+
+
+def values(cells):
+    """
+    Returns the minimax value of every board from the solved-position table.
+    """
+    return solved_table()[keys(cells)]
+
+
+def evaluate(cells):
+    """
+    Scores a batch of boards, returns a dict of arrays with keys
+    winner, terminal, player and value.
+    """
+    cells = np.asarray(cells)
+    return {
+        "winner": winners(cells),
+        "terminal": terminals(cells),
+        "player": players(cells),
+        "value": values(cells),
+    }
@@ -0,0 +1,205 @@
+"""
+Headless match runner for Tic Tac Toe engines.
+
+Plays N games between two engines across a process pool and reports
+throughput, work per move (searched nodes, MCTS iterations) and per-move
+latency percentiles.
+
+    python match.py -n 200 -x minimax -o random
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+import tictactoe as ttt
+from mcts import MCTS
+
+# Engines that play perfectly and therefore must never lose a game
+OPTIMAL_ENGINES = {"minimax"}
+
+
+def count_nodes(engine, board):
+    """
+    Runs the engine on the board and returns (action, nodes).
+    Every node searched by pickMax/pickMin calls terminal exactly once,
+    so the number of terminal calls is the number of visited nodes.
+    """
+    original = ttt.terminal
+    nodes = 0
+
+    def counting_terminal(board):
+        nonlocal nodes
+        nodes += 1
+        return original(board)
+
+    ttt.terminal = counting_terminal
+    try:
+        action = engine(board)
+    finally:
+        ttt.terminal = original
+    return action, nodes
+
+
+def minimax_engine(rng):
+    """
+    Returns an engine playing the minimax action, its work is the number of searched nodes.
+    """
+    return lambda board: count_nodes(ttt.minimax, board)
+
+
+def random_engine(rng):
+    """
+    Returns an engine playing a uniformly random legal action.
+    """
+    return lambda board: (rng.choice(sorted(ttt.actions(board))), 0)
+
+
+def mcts_engine(rng):
+    """
+    Returns an engine playing the MCTS action with a fixed iteration budget.
+    The same tree is reused for all moves of the side in the game, its work
+    is the number of iterations.
+    """
+    search = MCTS(seed=rng.randrange(2 ** 32))
+
+    def engine(board):
+        action = search.best_action(board, iterations=500)
+        return action, search.iterations
+    return engine
+
+
+# Engine name -> factory called once per side and game, the engine it returns
+# maps a board to (action, work done)
+ENGINES = {
+    "minimax": minimax_engine,
+    "random": random_engine,
+    "mcts": mcts_engine,
+}
+# What the work of each engine counts
+WORK_UNITS = {
+    "minimax": "nodes",
+    "random": "nodes",
+    "mcts": "iterations",
+}
+
+
+def play_game(game):
+    """
+    Plays one game and returns (index, engines, winner, moves).
+    engines maps X and O to engine names, moves is a list of
+    (engine name, latency in seconds, work) for every move made.
+    """
+    index, x_name, o_name, seed = game
+    engines = {ttt.X: x_name, ttt.O: o_name}
+    rng = random.Random(seed)
+    players = {side: ENGINES[name](rng) for side, name in engines.items()}
+    board = ttt.initial_state()
+    moves = []
+    while not ttt.terminal(board):
+        side = ttt.player(board)
+        start = time.perf_counter()
+        action, work = players[side](board)
+        latency = time.perf_counter() - start
+        moves.append((engines[side], latency, work))
+        board = ttt.result(board, action)
+    return index, engines, ttt.winner(board), moves
+
+
+def schedule(games, x_name, o_name, swap, seed):
+    """
+    Returns the list of games to play, alternating sides if swap is set.
+    """
+    ans = []
+    for i in range(games):
+        if swap and i % 2 == 1:
+            ans.append((i, o_name, x_name, seed + i))
+        else:
+            ans.append((i, x_name, o_name, seed + i))
+    return ans
+
+
+def percentile(values, q):
+    """
+    Returns the q-th percentile (0-100) of the values, nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(results, elapsed):
+    """
+    Builds the report lines and returns (lines, failures).
+    A failure is any game an optimal engine lost, two optimal engines must always draw.
+    """
+    wins = {}
+    draws = 0
+    failures = []
+    per_engine = {}
+    for index, engines, win, moves in results:
+        if win is None:
+            draws += 1
+        else:
+            wins[engines[win]] = wins.get(engines[win], 0) + 1
+            loser = engines[ttt.O if win == ttt.X else ttt.X]
+            if engines[win] in OPTIMAL_ENGINES and loser in OPTIMAL_ENGINES:
+                failures.append((index, f"optimal engines {engines[ttt.X]} and {engines[ttt.O]} did not draw"))
+            elif loser in OPTIMAL_ENGINES:
+                failures.append((index, f"optimal engine {loser} lost"))
+        for name, latency, work in moves:
+            stats = per_engine.setdefault(name, ([], []))
+            stats[0].append(latency)
+            stats[1].append(work)
+
+    games = len(results)
+    lines = [
+        f"games: {games}, elapsed: {elapsed:.3f}s, games/sec: {games / elapsed if elapsed else 0:.1f}",
+        "results: " + ", ".join([f"{name} wins={count}" for name, count in sorted(wins.items())] + [f"draws={draws}"]),
+    ]
+    for name, (latencies, work) in sorted(per_engine.items()):
+        ms = [latency * 1000 for latency in latencies]
+        lines.append(
+            f"{name}: moves={len(ms)}, {WORK_UNITS[name]}/move={sum(work) / len(work):.1f}, "
+            f"latency ms p50={percentile(ms, 50):.3f} p90={percentile(ms, 90):.3f} "
+            f"p99={percentile(ms, 99):.3f} max={max(ms):.3f}"
+        )
+    for index, reason in failures:
+        lines.append(f"FAIL: game {index}: {reason}")
+    return lines, failures
+
+
+def run_match(games, x_name, o_name, jobs=None, swap=True, seed=0):
+    """
+    Plays the games across a process pool and returns (results, elapsed).
+    """
+    plan = schedule(games, x_name, o_name, swap, seed)
+    start = time.perf_counter()
+    with Pool(processes=jobs) as pool:
+        results = sorted(pool.imap_unordered(play_game, plan, chunksize=max(1, games // 64)))
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe engines against each other.")
+    parser.add_argument("-n", "--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("-x", default="minimax", choices=sorted(ENGINES), help="engine playing X")
+    parser.add_argument("-o", default="random", choices=sorted(ENGINES), help="engine playing O")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--no-swap", action="store_true", help="do not alternate sides between games")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random engines")
+    args = parser.parse_args(argv)
+
+    results, elapsed = run_match(args.games, args.x, args.o, args.jobs, not args.no_swap, args.seed)
+    lines, failures = summarize(results, elapsed)
+    print("\n".join(lines))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
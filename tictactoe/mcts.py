@@ -0,0 +1,203 @@
+"""
+Monte Carlo Tree Search (UCT) for Tic Tac Toe family games.
+
+The engine only uses the game module interface: X, player, actions,
+result, terminal and utility, with utility scored from X's point of view.
+Any module providing those (e.g. an m,n,k variant) can be searched by
+passing its import name.
+"""
+
+import importlib
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class Node(object):
+    """
+    Search tree node
+    Attr:
+        board: Position of this node
+        parent: Parent node, None for the root
+        action: Action that led from the parent to this node
+        mover: Player who made that action, their rewards are stored here
+        children: action -> Node for the expanded children
+        untried: Actions not expanded yet
+        visits: Number of simulations through this node
+        reward: Sum of simulation rewards for 'mover'
+    """
+    def __init__(self, game, board, parent=None, action=None):
+        self.board = board
+        self.parent = parent
+        self.action = action
+        self.mover = parent.player if parent is not None else None
+        self.player = game.player(board)
+        self.children = {}
+        self.untried = [] if game.terminal(board) else sorted(game.actions(board))
+        self.visits = 0
+        self.reward = 0.0
+
+    def uct_child(self, exploration):
+        """
+        Returns the child maximizing the UCT score
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children.values(),
+                   key=lambda child: child.reward / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+
+class MCTS(object):
+    """
+    UCT search whose tree is kept between moves
+    Attr:
+        game: Game module providing the player/actions/result/terminal/utility interface
+        exploration: UCT exploration constant
+        root: Current root node, None before the first search
+        iterations: Iterations run by the last search
+        executor: Process pool of the parallel search, created on first use
+    """
+    def __init__(self, game="tictactoe", exploration=math.sqrt(2), seed=None):
+        self.game_name = game
+        self.game = importlib.import_module(game)
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.iterations = 0
+        self.executor = None
+        self.executor_workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the process pool used for parallel search, if any
+        """
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def reward(self, board, mover):
+        """
+        Returns 1 if 'mover' won on the terminal board, 0 if lost, 0.5 for a tie
+        """
+        score = self.game.utility(board)
+        if score == 0:
+            return 0.5
+        return 1.0 if (score > 0) == (mover == self.game.X) else 0.0
+
+    def advance(self, board):
+        """
+        Moves the root to the node for 'board' if it is already in the tree
+        (searched on an earlier move), otherwise starts a new tree
+        """
+        if self.root is not None:
+            if self.root.board == board:
+                return self.root
+            for child in self.root.children.values():
+                if child.board == board:
+                    return self._reroot(child)
+                for grandchild in child.children.values():
+                    if grandchild.board == board:
+                        return self._reroot(grandchild)
+        self.root = Node(self.game, board)
+        return self.root
+
+    def _reroot(self, node):
+        node.parent = None
+        self.root = node
+        return node
+
+    def iterate(self):
+        """
+        Runs one selection, expansion, simulation and backpropagation pass
+        """
+        game = self.game
+        node = self.root
+        # Selection
+        while not node.untried and node.children:
+            node = node.uct_child(self.exploration)
+        # Expansion
+        if node.untried:
+            action = node.untried.pop(self.rng.randrange(len(node.untried)))
+            child = Node(game, game.result(node.board, action), node, action)
+            node.children[action] = child
+            node = child
+        # Simulation
+        board = node.board
+        while not game.terminal(board):
+            board = game.result(board, self.rng.choice(sorted(game.actions(board))))
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if node.mover is not None:
+                node.reward += self.reward(board, node.mover)
+            node = node.parent
+
+    def search(self, board, iterations=None, time_limit=None):
+        """
+        Searches from 'board' until the iteration or time budget is spent
+        and returns action -> (visits, reward) for the root children.
+        The number of iterations run is kept in 'iterations'
+        """
+        if iterations is None and time_limit is None:
+            raise ValueError("iterations or time_limit is required")
+        root = self.advance(board)
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        done = 0
+        while root.untried or root.children:
+            if iterations is not None and done >= iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterate()
+            done += 1
+        self.iterations = done
+        return {action: (child.visits, child.reward) for action, child in root.children.items()}
+
+    def best_action(self, board, iterations=None, time_limit=None, workers=1):
+        """
+        Returns the most visited action for 'board'.
+        With workers > 1 the search is root-parallel: each process grows its
+        own tree with the same budget and the root statistics are summed.
+        Trees are not reused between moves in that mode, and the pool is
+        kept until close() is called.
+        """
+        if workers > 1:
+            if self.executor is None or self.executor_workers != workers:
+                self.close()
+                self.executor = ProcessPoolExecutor(max_workers=workers)
+                self.executor_workers = workers
+            stats = parallel_search(self.executor, self.game_name, board, iterations, time_limit,
+                                    self.exploration, workers, self.rng.randrange(2 ** 32))
+            self.iterations = sum(visits for visits, _ in stats.values())
+        else:
+            stats = self.search(board, iterations, time_limit)
+        if not stats:
+            return None
+        return max(stats, key=lambda action: stats[action][0])
+
+
+def _search_worker(args):
+    game, board, iterations, time_limit, exploration, seed = args
+    return MCTS(game, exploration, seed).search(board, iterations, time_limit)
+
+
+def parallel_search(executor, game, board, iterations=None, time_limit=None,
+                    exploration=math.sqrt(2), workers=2, seed=0):
+    """
+    Root-parallel search with 'workers' jobs on 'executor', returns the
+    summed action -> (visits, reward) of all workers
+    """
+    jobs = [(game, board, iterations, time_limit, exploration, seed + i) for i in range(workers)]
+    ans = {}
+    for stats in executor.map(_search_worker, jobs):
+        for action, (visits, reward) in stats.items():
+            total_visits, total_reward = ans.get(action, (0, 0.0))
+            ans[action] = (total_visits + visits, total_reward + reward)
+    return ans
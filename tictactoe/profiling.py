@@ -0,0 +1,195 @@
+"""
+Opt-in instrumentation for the Tic Tac Toe minimax search.
+
+Nothing in tictactoe.py is touched unless instrument() is active: the
+wrappers are swapped into the module on entry and the original functions
+are restored on exit, so the disabled path costs nothing.
+
+    python profiling.py --board "X.O......" --cprofile minimax.pstats --collapsed minimax.folded
+"""
+
+import argparse
+import cProfile
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+
+import tictactoe as ttt
+
+# Module level names replaced while instrumenting
+INSTRUMENTED = ["minimax", "pickMax", "pickMin", "actions", "result",
+                "deepcopy", "winner", "terminal", "utility", "player"]
+SEARCH = {"pickMax", "pickMin"}
+
+
+class SearchStats(object):
+    """
+    Counters and timings collected while instrument() is active
+    Attr:
+        nodes: Number of pickMax/pickMin calls
+        cutoffs: Number of nodes whose loop stopped early because of alpha-beta pruning
+        terminals: Number of terminal positions scored with utility
+        calls: Function name -> number of calls
+        total_time: Function name -> inclusive time in seconds, recursive calls are counted once
+                    (only the outermost active call of a name adds its time, as in cProfile)
+        self_time: Function name -> time in seconds spent in the function itself
+        stacks: Collapsed call stack ("minimax;pickMin;result") -> self time in seconds
+    """
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.terminals = 0
+        self.calls = {}
+        self.total_time = {}
+        self.self_time = {}
+        self.stacks = {}
+
+    def report(self):
+        """
+        Returns a human readable summary
+        """
+        lines = [f"nodes: {self.nodes}, cutoffs: {self.cutoffs}, terminal evaluations: {self.terminals}",
+                 f"{'function':<10}{'calls':>10}{'total ms':>12}{'self ms':>12}"]
+        for name in sorted(self.self_time, key=self.self_time.get, reverse=True):
+            lines.append(f"{name:<10}{self.calls[name]:>10}"
+                         f"{self.total_time[name] * 1000:>12.3f}{self.self_time[name] * 1000:>12.3f}")
+        return "\n".join(lines)
+
+    def write_collapsed(self, path):
+        """
+        Writes the stacks in the collapsed format read by flamegraph.pl and speedscope,
+        weights are in microseconds
+        """
+        with open(path, "w") as f:
+            for stack, seconds in sorted(self.stacks.items()):
+                f.write(f"{stack} {round(seconds * 1e6)}\n")
+
+
+class _Frame(object):
+    __slots__ = ("name", "path", "start", "child_time", "children", "choices")
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.start = time.perf_counter()
+        self.child_time = 0.0
+        self.children = 0
+        self.choices = None
+
+
+def _wrap(name, func, stats, stack):
+    active = 0  # Calls of this function currently on the stack
+
+    def wrapper(*args, **kwargs):
+        nonlocal active
+        parent = stack[-1] if stack else None
+        frame = _Frame(name, name if parent is None else parent.path + ";" + name)
+        if name in SEARCH:
+            stats.nodes += 1
+            if parent is not None:
+                parent.children += 1
+        elif name == "utility" and parent is not None and parent.name in SEARCH:
+            stats.terminals += 1
+
+        stack.append(frame)
+        active += 1
+        try:
+            ans = func(*args, **kwargs)
+        finally:
+            active -= 1
+            stack.pop()
+            elapsed = time.perf_counter() - frame.start
+            own = elapsed - frame.child_time
+            if parent is not None:
+                parent.child_time += elapsed
+            stats.calls[name] = stats.calls.get(name, 0) + 1
+            if active == 0:
+                stats.total_time[name] = stats.total_time.get(name, 0.0) + elapsed
+            else:
+                stats.total_time.setdefault(name, 0.0)
+            stats.self_time[name] = stats.self_time.get(name, 0.0) + own
+            stats.stacks[frame.path] = stats.stacks.get(frame.path, 0.0) + own
+
+        if name == "actions" and parent is not None:
+            parent.choices = len(ans)
+        elif name in SEARCH and frame.choices is not None and frame.children < frame.choices:
+            stats.cutoffs += 1
+        return ans
+
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+@contextmanager
+def instrument():
+    """
+    Instruments the tictactoe module for the duration of the with block and
+    yields the SearchStats being filled in. Not thread safe.
+    """
+    stats = SearchStats()
+    stack = []
+    originals = {name: getattr(ttt, name) for name in INSTRUMENTED}
+    try:
+        for name, func in originals.items():
+            setattr(ttt, name, _wrap(name, func, stats, stack))
+        yield stats
+    finally:
+        for name, func in originals.items():
+            setattr(ttt, name, func)
+
+
+def profile_minimax(board):
+    """
+    Runs minimax on the board with instrumentation, returns (action, stats).
+    """
+    with instrument() as stats:
+        action = ttt.minimax(board)
+    return action, stats
+
+
+def cprofile_minimax(board, path=None):
+    """
+    Runs minimax on the board under cProfile, returns (action, pstats.Stats).
+    The raw profile is dumped to path if given, for snakeviz, gprof2dot etc.
+    """
+    profiler = cProfile.Profile()
+    action = profiler.runcall(ttt.minimax, board)
+    if path is not None:
+        profiler.dump_stats(path)
+    return action, pstats.Stats(profiler)
+
+
+def parse_board(text):
+    """
+    Parses a 9 character board such as "X.O......", row by row,
+    '.' or '_' marks an empty cell.
+    """
+    cells = [c for c in text.upper() if not c.isspace() and c not in ",/"]
+    if len(cells) != 9 or any(c not in (ttt.X, ttt.O, ".", "_") for c in cells):
+        raise ValueError(f"invalid board: {text!r}")
+    cells = [c if c in (ttt.X, ttt.O) else ttt.EMPTY for c in cells]
+    return [cells[0:3], cells[3:6], cells[6:9]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the Tic Tac Toe minimax search on a board.")
+    parser.add_argument("--board", default=".........", help="9 cells row by row, '.' for empty")
+    parser.add_argument("--cprofile", metavar="PATH", help="also run under cProfile and dump pstats to PATH")
+    parser.add_argument("--collapsed", metavar="PATH", help="write flamegraph collapsed stacks to PATH")
+    args = parser.parse_args(argv)
+
+    board = parse_board(args.board)
+    action, stats = profile_minimax(board)
+    print(f"action: {action}")
+    print(stats.report())
+    if args.collapsed:
+        stats.write_collapsed(args.collapsed)
+    if args.cprofile:
+        _, profile = cprofile_minimax(board, args.cprofile)
+        profile.sort_stats("cumulative").print_stats(15)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
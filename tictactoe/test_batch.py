@@ -0,0 +1,59 @@
+"""
+Checks the batch API against the scalar functions over every reachable position.
+"""
+
+import batch
+import tictactoe as ttt
+
+CELL = {ttt.EMPTY: 0, ttt.X: 1, ttt.O: 2}
+
+
+def reachable():
+    """
+    Returns every position reachable from the initial board.
+    """
+    seen = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = str(board)
+        if key in seen:
+            continue
+        seen[key] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return list(seen.values())
+
+
+def scalar_value(board, cache):
+    """
+    Returns the minimax value of the board using only the scalar functions.
+    """
+    key = str(board)
+    if key not in cache:
+        if ttt.terminal(board):
+            cache[key] = ttt.utility(board)
+        else:
+            values = [scalar_value(ttt.result(board, action), cache) for action in ttt.actions(board)]
+            cache[key] = max(values) if ttt.player(board) == ttt.X else min(values)
+    return cache[key]
+
+
+def test_batch_matches_scalar():
+    boards = reachable()
+    assert len(boards) == 5478
+    result = batch.evaluate(batch.encode(boards))
+    cache = {}
+    for i, board in enumerate(boards):
+        assert result["winner"][i] == CELL[ttt.winner(board)]
+        assert result["terminal"][i] == ttt.terminal(board)
+        assert result["player"][i] == CELL[ttt.player(board)]
+        assert result["value"][i] == scalar_value(board, cache)
+
+
+def test_winner_takes_first_line():
+    # Both sides have a line, winner() reports the first row
+    boards = [[[ttt.O, ttt.O, ttt.O], [ttt.X, ttt.X, ttt.X], [ttt.EMPTY, ttt.EMPTY, ttt.EMPTY]],
+              [[ttt.X, ttt.X, ttt.X], [ttt.O, ttt.O, ttt.O], [ttt.EMPTY, ttt.EMPTY, ttt.EMPTY]]]
+    assert [CELL[ttt.winner(board)] for board in boards] == list(batch.winners(batch.encode(boards)))
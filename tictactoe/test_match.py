@@ -0,0 +1,33 @@
+"""
+Checks for the match runner statistics.
+"""
+
+import tictactoe as ttt
+from match import percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5
+    assert percentile(values, 30) == 3
+    assert percentile(values, 90) == 9
+    assert percentile(values, 99) == 10
+    assert percentile(values, 100) == 10
+    assert percentile(values, 0) == 1
+    assert percentile([6, 1, 5, 2, 4, 3], 50) == 3
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) == 0.0
+
+
+def test_optimal_self_play_must_draw():
+    engines = {ttt.X: "minimax", ttt.O: "minimax"}
+    results = [(0, engines, None, []), (1, engines, ttt.X, [])]
+    _, failures = summarize(results, 1.0)
+    assert [index for index, _ in failures] == [1]
+
+
+def test_optimal_engine_loss_fails():
+    engines = {ttt.X: "random", ttt.O: "minimax"}
+    results = [(0, engines, ttt.O, []), (1, engines, ttt.X, [])]
+    _, failures = summarize(results, 1.0)
+    assert [index for index, _ in failures] == [1]
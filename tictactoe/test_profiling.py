@@ -0,0 +1,18 @@
+"""
+Checks for the minimax instrumentation.
+"""
+
+import profiling
+import tictactoe as ttt
+
+
+def test_total_time_bounded_by_root():
+    board = profiling.parse_board("X........")
+    original = ttt.pickMax
+    _, stats = profiling.profile_minimax(board)
+    root = stats.total_time["minimax"]
+    for name, seconds in stats.total_time.items():
+        assert seconds <= root, name
+    assert sum(stats.self_time.values()) <= root * 1.001
+    # The module is restored after instrumentation
+    assert ttt.pickMax is original